@@ -0,0 +1,290 @@
+'''
+Business: iCalendar (.ics) feed of the schedule for calendar app subscriptions
+Args: event with httpMethod, queryStringParameters (class or teacher, year, term_start, tz),
+      headers (X-School-Id, If-None-Match)
+Returns: HTTP response with text/calendar body, or 304 when the feed has not changed
+'''
+import hashlib
+import json
+import os
+import threading
+import time
+import psycopg2
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DAY_INDEX = {
+    'Понедельник': 0,
+    'Вторник': 1,
+    'Среда': 2,
+    'Четверг': 3,
+    'Пятница': 4,
+    'Суббота': 5,
+    'Воскресенье': 6
+}
+
+DEFAULT_TZ = 'Europe/Moscow'
+VERSION_TTL_SECONDS = 30
+FEED_CACHE_SIZE = 512
+
+# Kept between invocations of a warm instance: each (school, year) data version
+# is re-read at most every VERSION_TTL_SECONDS, and rendered feeds are reused
+# until their tenant's version changes.
+_version_cache: Dict[Tuple[int, int], Tuple[int, float]] = {}
+_feed_cache: Dict[Tuple[str, ...], Tuple[int, str]] = {}
+# Guards eviction and insertion when one process serves requests from several threads.
+_feed_cache_lock = threading.Lock()
+
+
+def get_schedule_version(school_id: int, academic_year: int) -> int:
+    now = time.monotonic()
+    cached = _version_cache.get((school_id, academic_year))
+    if cached and now - cached[1] < VERSION_TTL_SECONDS:
+        return cached[0]
+
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT version FROM t_p1843782_school_schedule_mana.schedule_tenant_version WHERE school_id = %s AND academic_year = %s",
+            (school_id, academic_year)
+        )
+        row = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+
+    version = row[0] if row else 0
+    _version_cache[(school_id, academic_year)] = (version, now)
+    return version
+
+
+def current_academic_year() -> int:
+    today = date.today()
+    return today.year if today.month >= 8 else today.year - 1
+
+
+def lesson_date(term_start: date, week_number: int, day_name: str) -> Optional[date]:
+    '''Week 1 starts on the Monday of the week containing term_start.'''
+    weekday = DAY_INDEX.get((day_name or '').split(',')[0].strip())
+    if weekday is None or not week_number or week_number < 1:
+        return None
+    monday = term_start - timedelta(days=term_start.weekday())
+    try:
+        return monday + timedelta(weeks=week_number - 1, days=weekday)
+    except OverflowError:
+        return None
+
+
+def parse_time(value: str) -> Optional[dt_time]:
+    try:
+        return datetime.strptime((value or '').strip(), '%H:%M').time()
+    except ValueError:
+        return None
+
+
+def utc_stamp(day: date, at: dt_time, zone: ZoneInfo) -> str:
+    '''Lesson times are local to the school; emitted as UTC so no VTIMEZONE is needed.'''
+    return datetime.combine(day, at, tzinfo=zone).astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def escape_text(value: str) -> str:
+    return (
+        (value or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def fold_line(line: str) -> str:
+    '''Fold content lines at 75 octets (RFC 5545, 3.1) without splitting UTF-8 characters.'''
+    if len(line.encode('utf-8')) <= 75:
+        return line + '\r\n'
+    parts: List[str] = []
+    current = ''
+    size = 0
+    limit = 75
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(current)
+            current = ''
+            size = 0
+            limit = 74
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def iter_events(lessons: List[tuple], term_start: date, zone: ZoneInfo, dtstamp: str) -> Iterator[str]:
+    for lesson in lessons:
+        lesson_id, day_name, lesson_number, subject, time_start, time_end, teacher, homework, week_number = lesson
+        day = lesson_date(term_start, week_number, day_name)
+        start = parse_time(time_start)
+        end = parse_time(time_end)
+        if day is None or start is None or end is None:
+            continue
+
+        description = f'Урок {lesson_number}'
+        if teacher:
+            description += f'\nУчитель: {teacher}'
+        if homework:
+            description += f'\nДомашнее задание: {homework}'
+
+        yield 'BEGIN:VEVENT'
+        yield f'UID:lesson-{lesson_id}@school-schedule-manager'
+        yield f'DTSTAMP:{dtstamp}'
+        yield f'DTSTART:{utc_stamp(day, start, zone)}'
+        yield f'DTEND:{utc_stamp(day, end, zone)}'
+        yield f'SUMMARY:{escape_text(subject)}'
+        yield f'DESCRIPTION:{escape_text(description)}'
+        yield 'END:VEVENT'
+
+
+def iter_calendar(lessons: List[tuple], term_start: date, zone: ZoneInfo, name: str) -> Iterator[str]:
+    dtstamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR'
+    yield 'VERSION:2.0'
+    yield 'PRODID:-//school-schedule-manager//Schedule//RU'
+    yield 'CALSCALE:GREGORIAN'
+    yield 'METHOD:PUBLISH'
+    yield f'X-WR-CALNAME:{escape_text(name)}'
+    yield f'X-WR-TIMEZONE:{zone.key}'
+    yield from iter_events(lessons, term_start, zone, dtstamp)
+    yield 'END:VCALENDAR'
+
+
+def render_feed(school_id: int, academic_year: int, class_name: str, teacher: str, term_start: date, zone: ZoneInfo) -> str:
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    cur = conn.cursor()
+    try:
+        if teacher:
+            cur.execute("""
+                SELECT s.id, s.day_name, s.lesson_number, s.subject, s.time_start, s.time_end,
+                       s.teacher, s.homework, s.week_number
+                FROM schedule s
+                WHERE s.school_id = %s AND s.academic_year = %s AND s.teacher = %s
+                ORDER BY s.week_number, s.lesson_number
+            """, (school_id, academic_year, teacher))
+        else:
+            cur.execute("""
+                SELECT s.id, s.day_name, s.lesson_number, s.subject, s.time_start, s.time_end,
+                       s.teacher, s.homework, s.week_number
+                FROM schedule s
+                WHERE s.school_id = %s AND s.academic_year = %s AND s.class_name = %s
+                ORDER BY s.week_number, s.lesson_number
+            """, (school_id, academic_year, class_name))
+        lessons = cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
+
+    if teacher:
+        name = f'Расписание: {teacher}'
+    elif class_name:
+        name = f'Расписание: {class_name}'
+    else:
+        name = 'Расписание уроков'
+    return ''.join(fold_line(line) for line in iter_calendar(lessons, term_start, zone, name))
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    method: str = event.get('httpMethod', 'GET')
+    query_params = event.get('queryStringParameters') or {}
+    request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, If-None-Match, X-School-Id',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': '',
+            'isBase64Encoded': False
+        }
+
+    if method != 'GET':
+        return {
+            'statusCode': 405,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'Method not allowed'}),
+            'isBase64Encoded': False
+        }
+
+    teacher = (query_params.get('teacher') or '').strip()
+    class_name = (query_params.get('class') or '').strip()
+    tz = (query_params.get('tz') or DEFAULT_TZ).strip()
+    term_start_param = query_params.get('term_start')
+
+    try:
+        school_id = int(request_headers.get('x-school-id') or query_params.get('school') or 1)
+        academic_year = int(query_params.get('year') or current_academic_year())
+        term_start = date.fromisoformat(term_start_param) if term_start_param else date(academic_year, 9, 1)
+        zone = ZoneInfo(tz)
+    except (ValueError, ZoneInfoNotFoundError):
+        term_start = None
+
+    if term_start is None:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'school and year must be integers, term_start YYYY-MM-DD and tz an IANA time zone name'}),
+            'isBase64Encoded': False
+        }
+
+    version = get_schedule_version(school_id, academic_year)
+    cache_key = (str(school_id), str(academic_year), class_name, teacher, term_start.isoformat(), tz)
+    digest = hashlib.sha1(f'{version}|{"|".join(cache_key)}'.encode('utf-8')).hexdigest()
+    # Weak: instances render the same data with different DTSTAMPs, and
+    # compressing proxies weaken ETags anyway.
+    etag = f'W/"{digest}"'
+
+    response_headers = {
+        'Content-Type': 'text/calendar; charset=utf-8',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'ETag',
+        'Cache-Control': 'public, max-age=300',
+        'Vary': 'X-School-Id',
+        'ETag': etag
+    }
+
+    if_none_match = request_headers.get('if-none-match', '')
+    client_tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+    if etag.removeprefix('W/') in client_tags or if_none_match.strip() == '*':
+        return {
+            'statusCode': 304,
+            'headers': response_headers,
+            'body': '',
+            'isBase64Encoded': False
+        }
+
+    cached = _feed_cache.get(cache_key)
+    if cached and cached[0] == version:
+        body = cached[1]
+    else:
+        body = render_feed(school_id, academic_year, class_name, teacher, term_start, zone)
+        with _feed_cache_lock:
+            if cache_key not in _feed_cache and len(_feed_cache) >= FEED_CACHE_SIZE:
+                _feed_cache.pop(next(iter(_feed_cache)))
+            _feed_cache[cache_key] = (version, body)
+
+    return {
+        'statusCode': 200,
+        'headers': response_headers,
+        'body': body,
+        'isBase64Encoded': False
+    }
@@ -0,0 +1,342 @@
+'''
+Business: Host every backend function in one local HTTP server for self-hosting and load tests
+Args: command line options (host, port, workers, db pool size), DATABASE_URL in environment
+Returns: serves each backend/<name>/index.py handler under /<name>, as in func2url.json
+'''
+import argparse
+import base64
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger('local_server')
+
+
+class FunctionContext:
+    '''Minimal stand-in for the platform context object passed to handler(event, context).'''
+
+    def __init__(self, function_name: str, request_id: str, timeout_seconds: float):
+        self.function_name = function_name
+        self.function_version = 'local'
+        self.request_id = request_id
+        self.memory_limit_in_mb = 0
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+class PooledConnection:
+    '''psycopg2 connection borrowed from the shared pool; close() hands it back instead of disconnecting.'''
+
+    def __init__(self, pool: Any, slots: threading.BoundedSemaphore, conn: Any):
+        self._pool = pool
+        self._slots = slots
+        self._conn = conn
+        self._released = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        broken = bool(self._conn.closed)
+        if not broken:
+            try:
+                self._conn.rollback()
+            except Exception:
+                broken = True
+        self._pool.putconn(self._conn, close=broken)
+        self._slots.release()
+
+    def __del__(self) -> None:
+        if not getattr(self, '_released', True):
+            self.close()
+
+
+def install_db_pool(dsn: str, size: int) -> None:
+    '''Route psycopg2.connect(DATABASE_URL) in every handler through one ThreadedConnectionPool.'''
+    import psycopg2
+    from psycopg2 import pool as pg_pool
+
+    shared_pool = pg_pool.ThreadedConnectionPool(1, size, dsn)
+    slots = threading.BoundedSemaphore(size)
+    direct_connect = psycopg2.connect
+
+    def pooled_connect(*args: Any, **kwargs: Any) -> Any:
+        if kwargs or args != (dsn,):
+            return direct_connect(*args, **kwargs)
+        slots.acquire()
+        try:
+            conn = shared_pool.getconn()
+        except Exception:
+            slots.release()
+            raise
+        return PooledConnection(shared_pool, slots, conn)
+
+    psycopg2.connect = pooled_connect
+
+
+def discover_functions(only: Optional[List[str]] = None) -> Dict[str, Callable[[Dict[str, Any], Any], Dict[str, Any]]]:
+    functions: Dict[str, Callable[[Dict[str, Any], Any], Dict[str, Any]]] = {}
+    for name in sorted(os.listdir(BACKEND_DIR)):
+        path = os.path.join(BACKEND_DIR, name, 'index.py')
+        if not os.path.isfile(path) or (only and name not in only):
+            continue
+        module_name = 'backend_fn_' + name.replace('-', '_')
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module: ModuleType = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except ImportError as e:
+            logger.warning('Skipping /%s: %s (install %s/requirements.txt)', name, e, name)
+            continue
+        functions[name] = module.handler
+    return functions
+
+
+class FunctionRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'SchoolScheduleLocal/1.0'
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.dispatch()
+
+    def do_HEAD(self) -> None:
+        self.dispatch()
+
+    def do_POST(self) -> None:
+        self.dispatch()
+
+    def do_PUT(self) -> None:
+        self.dispatch()
+
+    def do_PATCH(self) -> None:
+        self.dispatch()
+
+    def do_DELETE(self) -> None:
+        self.dispatch()
+
+    def do_OPTIONS(self) -> None:
+        self.dispatch()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.access_log:
+            logger.info('%s - %s', self.address_string(), format % args)
+
+    def build_event(self, path: str, query: str, raw_body: bytes, request_id: str) -> Dict[str, Any]:
+        method = 'GET' if self.command == 'HEAD' else self.command
+        multi_params = parse_qs(query, keep_blank_values=True)
+        try:
+            body = raw_body.decode('utf-8')
+            is_base64 = False
+        except UnicodeDecodeError:
+            body = base64.b64encode(raw_body).decode('ascii')
+            is_base64 = True
+        return {
+            'httpMethod': method,
+            'path': path,
+            'headers': {key: value for key, value in self.headers.items()},
+            'queryStringParameters': {key: values[-1] for key, values in multi_params.items()},
+            'multiValueQueryStringParameters': multi_params,
+            'body': body,
+            'isBase64Encoded': is_base64,
+            'requestContext': {
+                'requestId': request_id,
+                'httpMethod': method,
+                'identity': {'sourceIp': self.client_address[0]}
+            }
+        }
+
+    def dispatch(self) -> None:
+        url = urlsplit(self.path)
+        segments = url.path.strip('/').split('/', 1)
+        name = segments[0]
+        handler = self.server.functions.get(name)
+
+        # Bodies are read by Content-Length only; anything else would leave bytes on
+        # the socket to be parsed as the next keep-alive request.
+        if self.headers.get('Transfer-Encoding'):
+            self.close_connection = True
+            self.send_result(411, {'Content-Type': 'application/json'}, json.dumps({'error': 'Content-Length required'}).encode('utf-8'))
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.close_connection = True
+            self.send_result(400, {'Content-Type': 'application/json'}, json.dumps({'error': 'Invalid Content-Length'}).encode('utf-8'))
+            return
+        raw_body = self.rfile.read(length) if length else b''
+
+        if handler is None:
+            self.send_result(404, {'Content-Type': 'application/json'}, json.dumps({'error': 'Function not found'}).encode('utf-8'))
+            return
+
+        request_id = str(uuid.uuid4())
+        event = self.build_event('/' + (segments[1] if len(segments) > 1 else ''), url.query, raw_body, request_id)
+        context = FunctionContext(name, request_id, self.server.function_timeout)
+
+        try:
+            status, headers, payload = self.encode_response(handler(event, context))
+        except Exception:
+            logger.exception('Unhandled error in /%s', name)
+            self.send_result(500, {'Content-Type': 'application/json'}, json.dumps({'error': 'Internal server error'}).encode('utf-8'))
+            return
+
+        self.send_result(status, headers, payload)
+
+    def encode_response(self, response: Any) -> Tuple[int, Dict[str, Any], bytes]:
+        '''Turn a handler's platform response into (status, headers, body bytes); raises on a malformed one.'''
+        if not isinstance(response, dict):
+            raise TypeError(f'handler returned {type(response).__name__}, expected dict')
+        status = int(response.get('statusCode', 200))
+        if not 100 <= status <= 599:
+            raise ValueError(f'invalid statusCode {status}')
+        headers = response.get('headers') or {}
+        if not isinstance(headers, dict):
+            raise TypeError('headers must be a dict')
+        body = response.get('body') or ''
+        if response.get('isBase64Encoded'):
+            payload = base64.b64decode(body, validate=True)
+        elif isinstance(body, (dict, list)):
+            payload = json.dumps(body).encode('utf-8')
+        else:
+            payload = str(body).encode('utf-8')
+        return status, headers, payload
+
+    def send_result(self, status: int, headers: Dict[str, Any], payload: bytes) -> None:
+        if status == 304 or status < 200:
+            payload = b''
+        self.send_response(status)
+        for key, value in headers.items():
+            if key.lower() not in ('content-length', 'connection', 'transfer-encoding'):
+                self.send_header(key, str(value))
+        if status != 304 and status >= 200:
+            self.send_header('Content-Length', str(len(payload)))
+        if self.server.waiting_for_worker.is_set():
+            self.close_connection = True
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        if self.command != 'HEAD' and payload:
+            self.wfile.write(payload)
+
+
+class PooledHTTPServer(HTTPServer):
+    '''
+    HTTPServer that serves connections on a fixed-size worker pool instead of a thread per connection.
+
+    A keep-alive connection holds its worker between requests. When every worker is busy
+    the server stops accepting, so new clients wait in the listen backlog, and busy
+    connections are closed after their current response so workers rotate. A waiting
+    client is thus served after at most one request on each busy connection, or after
+    keepalive_timeout when the busy connections are idle.
+    '''
+
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], functions: Dict[str, Callable[[Dict[str, Any], Any], Dict[str, Any]]],
+                 workers: int, keepalive_timeout: float, function_timeout: float, access_log: bool):
+        self.functions = functions
+        self.function_timeout = function_timeout
+        self.access_log = access_log
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='worker')
+        self.worker_slots = threading.BoundedSemaphore(workers)
+        self.waiting_for_worker = threading.Event()
+        request_handler = type('FunctionRequestHandler', (FunctionRequestHandler,), {'timeout': keepalive_timeout})
+        super().__init__(address, request_handler)
+
+    def get_request(self) -> Tuple[Any, Any]:
+        if not self.worker_slots.acquire(blocking=False):
+            self.waiting_for_worker.set()
+            self.worker_slots.acquire()
+            self.waiting_for_worker.clear()
+        try:
+            return self.socket.accept()
+        except OSError:
+            self.worker_slots.release()
+            raise
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        try:
+            self.executor.submit(self.process_request_thread, request, client_address)
+        except Exception:
+            self.worker_slots.release()
+            raise
+
+    def process_request_thread(self, request: Any, client_address: Any) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.worker_slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Serve all backend functions from one process')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=32, help='worker threads, i.e. connections served at once; further clients wait in the listen backlog')
+    parser.add_argument('--db-pool', type=int, default=0, help='shared DB connections (0: same as --workers, negative: no pooling)')
+    parser.add_argument('--keepalive-timeout', type=float, default=5.0, help='seconds an idle keep-alive connection holds a worker before it is closed')
+    parser.add_argument('--function-timeout', type=float, default=30.0, help='value reported by context.get_remaining_time_in_millis')
+    parser.add_argument('--functions', default='', help='comma-separated subset of functions to mount')
+    parser.add_argument('--access-log', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    dsn = os.environ.get('DATABASE_URL')
+    pool_size = args.db_pool if args.db_pool else args.workers
+    if dsn and pool_size > 0:
+        try:
+            install_db_pool(dsn, pool_size)
+        except ImportError:
+            logger.warning('psycopg2 is not installed, database pooling disabled')
+    elif not dsn:
+        logger.warning('DATABASE_URL is not set, database-backed functions will fail')
+
+    only = [name.strip() for name in args.functions.split(',') if name.strip()]
+    functions = discover_functions(only)
+    if not functions:
+        sys.exit('No backend functions could be loaded')
+
+    server = PooledHTTPServer((args.host, args.port), functions, args.workers,
+                              args.keepalive_timeout, args.function_timeout, args.access_log)
+    for name in functions:
+        logger.info('Mounted http://%s:%s/%s', args.host, args.port, name)
+    logger.info('Serving with %s workers', args.workers)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,58 @@
 '''
 Business: Manage schedule - CRUD operations and week duplication
-Args: event with httpMethod, body with schedule data
+Args: event with httpMethod, body with schedule data, X-School-Id header,
+      queryStringParameters/body with class and academic year
 Returns: HTTP response with schedule data
 '''
 import json
 import os
 import psycopg2
+import psycopg2.errors
+from datetime import date
 from typing import Dict, Any
 
+# Writes are accepted for the current academic year and its neighbours only.
+# Year partitions are never created from a request: V0008 opens the previous
+# year through ten years ahead, and a yearly pg_cron job (where installed)
+# keeps that range rolling, so every year in this window has a partition.
+WRITABLE_YEARS_WINDOW = 1
+
+def current_academic_year() -> int:
+    today = date.today()
+    return today.year if today.month >= 8 else today.year - 1
+
+def get_tenant(event: Dict[str, Any], query_params: Dict[str, Any], body_data: Dict[str, Any]) -> tuple:
+    '''Returns (school_id, academic_year, class_name); school from X-School-Id header or school param.'''
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    school_id = int(headers.get('x-school-id') or query_params.get('school') or 1)
+    academic_year = int(body_data.get('academic_year') or query_params.get('year') or current_academic_year())
+    class_name = body_data.get('class_name', query_params.get('class', '')) or ''
+    return school_id, academic_year, class_name
+
+def year_not_open_response() -> Dict[str, Any]:
+    '''No partition exists for the year yet (insert fails with check_violation).'''
+    return {
+        'statusCode': 409,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({'error': 'Academic year is not open yet'}),
+        'isBase64Encoded': False
+    }
+
+def lesson_not_found_response() -> Dict[str, Any]:
+    '''No lesson with this id in the requested school and academic year.'''
+    return {
+        'statusCode': 404,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({'error': 'Lesson not found'}),
+        'isBase64Encoded': False
+    }
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     query_params = event.get('queryStringParameters') or {}
@@ -18,13 +63,39 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Headers': 'Content-Type, X-School-Id',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
+    body_data = json.loads(event.get('body') or '{}') if method in ('POST', 'PUT', 'DELETE') else {}
+    
+    try:
+        school_id, academic_year, class_name = get_tenant(event, query_params, body_data)
+    except ValueError:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'School and academic year must be integers'}),
+            'isBase64Encoded': False
+        }
+    
+    if method in ('POST', 'PUT', 'DELETE') and abs(academic_year - current_academic_year()) > WRITABLE_YEARS_WINDOW:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'Academic year is outside the editable range'}),
+            'isBase64Encoded': False
+        }
+    
     conn = psycopg2.connect(os.environ['DATABASE_URL'])
     cur = conn.cursor()
     
@@ -33,11 +104,13 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         cur.execute("""
             SELECT s.id, s.day_name, s.lesson_number, s.subject, s.time_start, s.time_end,
-                   s.teacher, s.homework, s.notes, s.week_number, s.homework_files
+                   s.teacher, s.homework, s.notes, s.week_number, s.homework_files,
+                   s.class_name, s.academic_year
             FROM schedule s
-            WHERE s.week_number = %s
+            WHERE s.school_id = %s AND s.academic_year = %s AND s.class_name = %s
+              AND s.week_number = %s
             ORDER BY s.lesson_number
-        """, (week_number,))
+        """, (school_id, academic_year, class_name, week_number))
         
         lessons = cur.fetchall()
         
@@ -54,7 +127,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 'homework': lesson[7] or '',
                 'notes': lesson[8] or '',
                 'week_number': lesson[9],
-                'homework_files': lesson[10] or ''
+                'homework_files': lesson[10] or '',
+                'class_name': lesson[11],
+                'academic_year': lesson[12]
             })
         
         cur.close()
@@ -71,20 +146,24 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
     
     elif method == 'POST':
-        body_data = json.loads(event.get('body', '{}'))
-        
         action = body_data.get('action')
         
         if action == 'duplicate_week':
             source_week = body_data.get('source_week', 1)
             target_week = body_data.get('target_week', 2)
             
-            cur.execute("""
-                INSERT INTO schedule (day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, week_number)
-                SELECT day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, %s
-                FROM schedule
-                WHERE week_number = %s
-            """, (target_week, source_week))
+            try:
+                cur.execute("""
+                    INSERT INTO schedule (school_id, class_name, academic_year, day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, week_number)
+                    SELECT school_id, class_name, academic_year, day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, %s
+                    FROM schedule
+                    WHERE school_id = %s AND academic_year = %s AND class_name = %s AND week_number = %s
+                """, (target_week, school_id, academic_year, class_name, source_week))
+            except psycopg2.errors.CheckViolation:
+                conn.rollback()
+                cur.close()
+                conn.close()
+                return year_not_open_response()
             
             conn.commit()
             cur.close()
@@ -111,11 +190,17 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             week_number = body_data.get('week_number', 1)
             homework_files = body_data.get('homework_files', '')
             
-            cur.execute("""
-                INSERT INTO schedule (day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, week_number, homework_files)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, week_number, homework_files))
+            try:
+                cur.execute("""
+                    INSERT INTO schedule (school_id, class_name, academic_year, day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, week_number, homework_files)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (school_id, class_name, academic_year, day_name, lesson_number, subject, time_start, time_end, teacher, homework, notes, week_number, homework_files))
+            except psycopg2.errors.CheckViolation:
+                conn.rollback()
+                cur.close()
+                conn.close()
+                return year_not_open_response()
             
             lesson_id = cur.fetchone()[0]
             
@@ -134,7 +219,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             }
     
     elif method == 'PUT':
-        body_data = json.loads(event.get('body', '{}'))
         lesson_id = body_data.get('id')
         subject = body_data.get('subject')
         time_start = body_data.get('time_start')
@@ -147,8 +231,14 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         cur.execute("""
             UPDATE schedule
             SET subject = %s, time_start = %s, time_end = %s, teacher = %s, homework = %s, notes = %s, homework_files = %s
-            WHERE id = %s
-        """, (subject, time_start, time_end, teacher, homework, notes, homework_files, lesson_id))
+            WHERE school_id = %s AND academic_year = %s AND id = %s
+        """, (subject, time_start, time_end, teacher, homework, notes, homework_files, school_id, academic_year, lesson_id))
+        
+        if cur.rowcount == 0:
+            conn.rollback()
+            cur.close()
+            conn.close()
+            return lesson_not_found_response()
         
         conn.commit()
         cur.close()
@@ -165,10 +255,18 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         }
     
     elif method == 'DELETE':
-        body_data = json.loads(event.get('body', '{}'))
         lesson_id = body_data.get('id')
         
-        cur.execute("DELETE FROM schedule WHERE id = %s", (lesson_id,))
+        cur.execute(
+            "DELETE FROM schedule WHERE school_id = %s AND academic_year = %s AND id = %s",
+            (school_id, academic_year, lesson_id)
+        )
+        
+        if cur.rowcount == 0:
+            conn.rollback()
+            cur.close()
+            conn.close()
+            return lesson_not_found_response()
         
         conn.commit()
         cur.close()
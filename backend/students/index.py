@@ -1,6 +1,7 @@
 '''
 Business: Manage students - create, read, update, delete
-Args: event with httpMethod, body with student data
+Args: event with httpMethod, body with student data, X-School-Id header,
+      queryStringParameters with optional class filter
 Returns: HTTP response with student data or list of students
 '''
 import json
@@ -8,6 +9,11 @@ import os
 import psycopg2
 from typing import Dict, Any
 
+def get_school_id(event: Dict[str, Any]) -> int:
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    query_params = event.get('queryStringParameters') or {}
+    return int(headers.get('x-school-id') or query_params.get('school') or 1)
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
     
@@ -17,24 +23,48 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Headers': 'Content-Type, X-School-Id',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
+    try:
+        school_id = get_school_id(event)
+    except ValueError:
+        return {
+            'statusCode': 400,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({'error': 'School must be an integer'}),
+            'isBase64Encoded': False
+        }
+    
     conn = psycopg2.connect(os.environ['DATABASE_URL'])
     cur = conn.cursor()
     
     if method == 'GET':
-        cur.execute("""
-            SELECT u.id, u.login, u.full_name, s.class_name, s.parent_contact, s.notes
-            FROM users u
-            LEFT JOIN students s ON u.id = s.user_id
-            WHERE u.role = 'student'
-            ORDER BY u.full_name
-        """)
+        class_name = (event.get('queryStringParameters') or {}).get('class')
+        
+        if class_name:
+            cur.execute("""
+                SELECT u.id, u.login, u.full_name, s.class_name, s.parent_contact, s.notes
+                FROM students s
+                JOIN users u ON u.id = s.user_id
+                WHERE u.role = 'student' AND s.school_id = %s AND s.class_name = %s
+                ORDER BY u.full_name
+            """, (school_id, class_name))
+        else:
+            cur.execute("""
+                SELECT u.id, u.login, u.full_name, s.class_name, s.parent_contact, s.notes
+                FROM students s
+                JOIN users u ON u.id = s.user_id
+                WHERE u.role = 'student' AND s.school_id = %s
+                ORDER BY u.full_name
+            """, (school_id,))
         students = cur.fetchall()
         
         result = []
@@ -77,8 +107,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         user_id = cur.fetchone()[0]
         
         cur.execute(
-            "INSERT INTO students (user_id, class_name, parent_contact, notes) VALUES (%s, %s, %s, %s)",
-            (user_id, class_name, parent_contact, notes)
+            "INSERT INTO students (user_id, school_id, class_name, parent_contact, notes) VALUES (%s, %s, %s, %s, %s)",
+            (user_id, school_id, class_name, parent_contact, notes)
         )
         
         conn.commit()
@@ -104,6 +134,26 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         parent_contact = body_data.get('parent_contact', '')
         notes = body_data.get('notes', '')
         
+        cur.execute(
+            "UPDATE students SET class_name = %s, parent_contact = %s, notes = %s WHERE school_id = %s AND user_id = %s",
+            (class_name, parent_contact, notes, school_id, user_id)
+        )
+        
+        if cur.rowcount == 0:
+            conn.rollback()
+            cur.close()
+            conn.close()
+            
+            return {
+                'statusCode': 404,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps({'error': 'Student not found'}),
+                'isBase64Encoded': False
+            }
+        
         if password:
             cur.execute(
                 "UPDATE users SET full_name = %s, password = %s WHERE id = %s",
@@ -115,11 +165,6 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 (full_name, user_id)
             )
         
-        cur.execute(
-            "UPDATE students SET class_name = %s, parent_contact = %s, notes = %s WHERE user_id = %s",
-            (class_name, parent_contact, notes, user_id)
-        )
-        
         conn.commit()
         cur.close()
         conn.close()
@@ -3,10 +3,16 @@ import os
 import psycopg2
 from typing import Dict, Any
 
+def get_school_id(event: Dict[str, Any]) -> int:
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    query_params = event.get('queryStringParameters') or {}
+    return int(headers.get('x-school-id') or query_params.get('school') or 1)
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Manage teachers list for schedule
-    Args: event with httpMethod (GET/POST/PUT/DELETE), body, queryStringParameters
+    Args: event with httpMethod (GET/POST/PUT/DELETE), body, queryStringParameters,
+          headers with X-School-Id
           context with request_id
     Returns: HTTP response with teachers data
     '''
@@ -18,25 +24,38 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id, X-Auth-Token',
+                'Access-Control-Allow-Headers': 'Content-Type, X-User-Id, X-Auth-Token, X-School-Id',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
-    dsn = os.environ.get('DATABASE_URL')
-    conn = psycopg2.connect(dsn)
-    cur = conn.cursor()
-    
     headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*'
     }
     
+    try:
+        school_id = get_school_id(event)
+    except ValueError:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'error': 'School must be an integer'}),
+            'isBase64Encoded': False
+        }
+    
+    dsn = os.environ.get('DATABASE_URL')
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    
     try:
         if method == 'GET':
-            cur.execute("SELECT id, full_name, subject, phone, email, notes FROM t_p1843782_school_schedule_mana.teachers ORDER BY full_name")
+            cur.execute(
+                "SELECT id, full_name, subject, phone, email, notes FROM t_p1843782_school_schedule_mana.teachers WHERE school_id=%s ORDER BY full_name",
+                (school_id,)
+            )
             rows = cur.fetchall()
             teachers = []
             for row in rows:
@@ -65,8 +84,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             notes = body_data.get('notes', '')
             
             cur.execute(
-                "INSERT INTO t_p1843782_school_schedule_mana.teachers (full_name, subject, phone, email, notes) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-                (full_name, subject, phone, email, notes)
+                "INSERT INTO t_p1843782_school_schedule_mana.teachers (school_id, full_name, subject, phone, email, notes) VALUES (%s, %s, %s, %s, %s, %s) RETURNING id",
+                (school_id, full_name, subject, phone, email, notes)
             )
             teacher_id = cur.fetchone()[0]
             conn.commit()
@@ -88,8 +107,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             notes = body_data.get('notes')
             
             cur.execute(
-                "UPDATE t_p1843782_school_schedule_mana.teachers SET full_name=%s, subject=%s, phone=%s, email=%s, notes=%s WHERE id=%s",
-                (full_name, subject, phone, email, notes, teacher_id)
+                "UPDATE t_p1843782_school_schedule_mana.teachers SET full_name=%s, subject=%s, phone=%s, email=%s, notes=%s WHERE school_id=%s AND id=%s",
+                (full_name, subject, phone, email, notes, school_id, teacher_id)
             )
             conn.commit()
             
@@ -104,7 +123,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             params = event.get('queryStringParameters', {})
             teacher_id = params.get('id')
             
-            cur.execute("DELETE FROM t_p1843782_school_schedule_mana.teachers WHERE id=%s", (teacher_id,))
+            cur.execute("DELETE FROM t_p1843782_school_schedule_mana.teachers WHERE school_id=%s AND id=%s", (school_id, teacher_id))
             conn.commit()
             
             return {
@@ -0,0 +1,26 @@
+-- Schedule data version, bumped on every change to schedule rows.
+-- Used by the calendar feed as a cheap cache key / ETag source.
+CREATE TABLE IF NOT EXISTS t_p1843782_school_schedule_mana.schedule_version (
+  id INTEGER PRIMARY KEY CHECK (id = 1),
+  version BIGINT NOT NULL DEFAULT 1,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO t_p1843782_school_schedule_mana.schedule_version (id, version)
+VALUES (1, 1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE t_p1843782_school_schedule_mana.schedule_version
+  SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+  WHERE id = 1;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_schedule_version ON t_p1843782_school_schedule_mana.schedule;
+CREATE TRIGGER trg_schedule_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON t_p1843782_school_schedule_mana.schedule
+FOR EACH STATEMENT EXECUTE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_version();
@@ -0,0 +1,102 @@
+-- Tenant (school, class) and academic year dimensions.
+-- schedule becomes LIST-partitioned by academic_year, each year HASH-partitioned by school_id,
+-- so a (school_id, academic_year) query touches a single leaf partition and a whole year
+-- can be detached into an archive table.
+
+ALTER TABLE t_p1843782_school_schedule_mana.lesson_files DROP CONSTRAINT IF EXISTS lesson_files_schedule_id_fkey;
+DROP TRIGGER IF EXISTS trg_schedule_version ON t_p1843782_school_schedule_mana.schedule;
+ALTER TABLE t_p1843782_school_schedule_mana.schedule RENAME TO schedule_legacy;
+
+CREATE TABLE t_p1843782_school_schedule_mana.schedule (
+  id INTEGER NOT NULL DEFAULT nextval('t_p1843782_school_schedule_mana.schedule_id_seq'),
+  school_id INTEGER NOT NULL DEFAULT 1,
+  class_name VARCHAR(50) NOT NULL DEFAULT '',
+  academic_year INTEGER NOT NULL,
+  day_name VARCHAR(50) NOT NULL,
+  lesson_number INTEGER NOT NULL,
+  subject VARCHAR(100) NOT NULL,
+  time_start VARCHAR(10) NOT NULL,
+  time_end VARCHAR(10) NOT NULL,
+  teacher VARCHAR(255) NOT NULL,
+  homework TEXT,
+  notes TEXT,
+  week_number INTEGER DEFAULT 1,
+  homework_files TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (academic_year, school_id, id)
+) PARTITION BY LIST (academic_year);
+
+ALTER SEQUENCE t_p1843782_school_schedule_mana.schedule_id_seq OWNED BY t_p1843782_school_schedule_mana.schedule.id;
+
+CREATE INDEX IF NOT EXISTS idx_schedule_tenant_week
+  ON t_p1843782_school_schedule_mana.schedule (school_id, academic_year, class_name, week_number);
+CREATE INDEX IF NOT EXISTS idx_schedule_tenant_teacher
+  ON t_p1843782_school_schedule_mana.schedule (school_id, academic_year, teacher);
+
+-- Creates the partition for one academic year (idempotent).
+CREATE OR REPLACE FUNCTION t_p1843782_school_schedule_mana.create_schedule_year(p_year INTEGER, p_school_partitions INTEGER DEFAULT 8)
+RETURNS VOID AS $$
+DECLARE
+  year_table TEXT := 'schedule_y' || p_year;
+  i INTEGER;
+BEGIN
+  IF to_regclass('t_p1843782_school_schedule_mana.' || year_table) IS NOT NULL THEN
+    RETURN;
+  END IF;
+  EXECUTE format(
+    'CREATE TABLE t_p1843782_school_schedule_mana.%I PARTITION OF t_p1843782_school_schedule_mana.schedule FOR VALUES IN (%s) PARTITION BY HASH (school_id)',
+    year_table, p_year
+  );
+  FOR i IN 0..p_school_partitions - 1 LOOP
+    EXECUTE format(
+      'CREATE TABLE t_p1843782_school_schedule_mana.%I PARTITION OF t_p1843782_school_schedule_mana.%I FOR VALUES WITH (MODULUS %s, REMAINDER %s)',
+      year_table || '_p' || i, year_table, p_school_partitions, i
+    );
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Detaches an academic year from schedule and keeps it as schedule_archive_y<year>.
+CREATE OR REPLACE FUNCTION t_p1843782_school_schedule_mana.archive_schedule_year(p_year INTEGER)
+RETURNS VOID AS $$
+BEGIN
+  EXECUTE format(
+    'ALTER TABLE t_p1843782_school_schedule_mana.schedule DETACH PARTITION t_p1843782_school_schedule_mana.%I',
+    'schedule_y' || p_year
+  );
+  EXECUTE format(
+    'ALTER TABLE t_p1843782_school_schedule_mana.%I RENAME TO %I',
+    'schedule_y' || p_year, 'schedule_archive_y' || p_year
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Academic year starts in August; existing rows belong to the year that is current now.
+SELECT t_p1843782_school_schedule_mana.create_schedule_year(
+  (EXTRACT(YEAR FROM CURRENT_DATE) - CASE WHEN EXTRACT(MONTH FROM CURRENT_DATE) >= 8 THEN 0 ELSE 1 END)::INTEGER
+);
+SELECT t_p1843782_school_schedule_mana.create_schedule_year(
+  (EXTRACT(YEAR FROM CURRENT_DATE) + CASE WHEN EXTRACT(MONTH FROM CURRENT_DATE) >= 8 THEN 1 ELSE 0 END)::INTEGER
+);
+
+INSERT INTO t_p1843782_school_schedule_mana.schedule
+  (id, school_id, class_name, academic_year, day_name, lesson_number, subject, time_start, time_end,
+   teacher, homework, notes, week_number, homework_files, created_at)
+SELECT id, 1, '',
+       (EXTRACT(YEAR FROM CURRENT_DATE) - CASE WHEN EXTRACT(MONTH FROM CURRENT_DATE) >= 8 THEN 0 ELSE 1 END)::INTEGER,
+       day_name, lesson_number, subject, time_start, time_end,
+       teacher, homework, notes, week_number, homework_files, created_at
+FROM t_p1843782_school_schedule_mana.schedule_legacy;
+
+DROP TABLE t_p1843782_school_schedule_mana.schedule_legacy;
+
+CREATE TRIGGER trg_schedule_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON t_p1843782_school_schedule_mana.schedule
+FOR EACH STATEMENT EXECUTE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_version();
+
+-- Students and teachers are scoped to a school as well
+ALTER TABLE t_p1843782_school_schedule_mana.students ADD COLUMN IF NOT EXISTS school_id INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE t_p1843782_school_schedule_mana.teachers ADD COLUMN IF NOT EXISTS school_id INTEGER NOT NULL DEFAULT 1;
+
+CREATE INDEX IF NOT EXISTS idx_students_school_class ON t_p1843782_school_schedule_mana.students (school_id, class_name);
+CREATE INDEX IF NOT EXISTS idx_teachers_school ON t_p1843782_school_schedule_mana.teachers (school_id, full_name);
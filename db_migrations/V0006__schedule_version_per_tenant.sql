@@ -0,0 +1,84 @@
+-- Schedule data version per (school_id, academic_year), so an edit in one school or year
+-- only invalidates that tenant's cached calendar feeds. Replaces the global schedule_version.
+CREATE TABLE IF NOT EXISTS t_p1843782_school_schedule_mana.schedule_tenant_version (
+  school_id INTEGER NOT NULL,
+  academic_year INTEGER NOT NULL,
+  version BIGINT NOT NULL DEFAULT 1,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (school_id, academic_year)
+);
+
+INSERT INTO t_p1843782_school_schedule_mana.schedule_tenant_version (school_id, academic_year)
+SELECT DISTINCT school_id, academic_year FROM t_p1843782_school_schedule_mana.schedule
+ON CONFLICT (school_id, academic_year) DO NOTHING;
+
+-- Statement-level with transition tables: one upsert per statement, one row per touched tenant.
+CREATE OR REPLACE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_tenant_version()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO t_p1843782_school_schedule_mana.schedule_tenant_version (school_id, academic_year)
+    SELECT DISTINCT school_id, academic_year FROM new_rows
+    ON CONFLICT (school_id, academic_year) DO UPDATE
+    SET version = schedule_tenant_version.version + 1, updated_at = CURRENT_TIMESTAMP;
+  ELSIF TG_OP = 'UPDATE' THEN
+    INSERT INTO t_p1843782_school_schedule_mana.schedule_tenant_version (school_id, academic_year)
+    SELECT school_id, academic_year FROM old_rows
+    UNION
+    SELECT school_id, academic_year FROM new_rows
+    ON CONFLICT (school_id, academic_year) DO UPDATE
+    SET version = schedule_tenant_version.version + 1, updated_at = CURRENT_TIMESTAMP;
+  ELSIF TG_OP = 'DELETE' THEN
+    INSERT INTO t_p1843782_school_schedule_mana.schedule_tenant_version (school_id, academic_year)
+    SELECT DISTINCT school_id, academic_year FROM old_rows
+    ON CONFLICT (school_id, academic_year) DO UPDATE
+    SET version = schedule_tenant_version.version + 1, updated_at = CURRENT_TIMESTAMP;
+  ELSE
+    UPDATE t_p1843782_school_schedule_mana.schedule_tenant_version
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_schedule_version ON t_p1843782_school_schedule_mana.schedule;
+
+CREATE TRIGGER trg_schedule_tenant_version_ins
+AFTER INSERT ON t_p1843782_school_schedule_mana.schedule
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_tenant_version();
+
+CREATE TRIGGER trg_schedule_tenant_version_upd
+AFTER UPDATE ON t_p1843782_school_schedule_mana.schedule
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_tenant_version();
+
+CREATE TRIGGER trg_schedule_tenant_version_del
+AFTER DELETE ON t_p1843782_school_schedule_mana.schedule
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_tenant_version();
+
+CREATE TRIGGER trg_schedule_tenant_version_truncate
+AFTER TRUNCATE ON t_p1843782_school_schedule_mana.schedule
+FOR EACH STATEMENT EXECUTE FUNCTION t_p1843782_school_schedule_mana.bump_schedule_tenant_version();
+
+DROP FUNCTION IF EXISTS t_p1843782_school_schedule_mana.bump_schedule_version();
+DROP TABLE IF EXISTS t_p1843782_school_schedule_mana.schedule_version;
+
+-- Detaching a year must also invalidate its cached feeds
+CREATE OR REPLACE FUNCTION t_p1843782_school_schedule_mana.archive_schedule_year(p_year INTEGER)
+RETURNS VOID AS $$
+BEGIN
+  EXECUTE format(
+    'ALTER TABLE t_p1843782_school_schedule_mana.schedule DETACH PARTITION t_p1843782_school_schedule_mana.%I',
+    'schedule_y' || p_year
+  );
+  EXECUTE format(
+    'ALTER TABLE t_p1843782_school_schedule_mana.%I RENAME TO %I',
+    'schedule_y' || p_year, 'schedule_archive_y' || p_year
+  );
+  UPDATE t_p1843782_school_schedule_mana.schedule_tenant_version
+  SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+  WHERE academic_year = p_year;
+END;
+$$ LANGUAGE plpgsql;
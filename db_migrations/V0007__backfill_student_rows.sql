@@ -0,0 +1,9 @@
+-- Student listing is scoped by students.school_id, so every student user needs a students row.
+-- Users created before the tenant columns without one are assigned to school 1.
+INSERT INTO t_p1843782_school_schedule_mana.students (user_id, school_id)
+SELECT u.id, 1
+FROM t_p1843782_school_schedule_mana.users u
+WHERE u.role = 'student'
+  AND NOT EXISTS (
+    SELECT 1 FROM t_p1843782_school_schedule_mana.students s WHERE s.user_id = u.id
+  );
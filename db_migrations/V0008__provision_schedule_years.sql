@@ -0,0 +1,25 @@
+-- Open schedule partitions ahead of time so writes never depend on manual SQL:
+-- the previous academic year through ten years ahead (the handler accepts the current year +/-1).
+DO $$
+DECLARE
+  current_year INTEGER := (EXTRACT(YEAR FROM CURRENT_DATE) - CASE WHEN EXTRACT(MONTH FROM CURRENT_DATE) >= 8 THEN 0 ELSE 1 END)::INTEGER;
+  y INTEGER;
+BEGIN
+  FOR y IN current_year - 1 .. current_year + 10 LOOP
+    PERFORM t_p1843782_school_schedule_mana.create_schedule_year(y);
+  END LOOP;
+END;
+$$;
+
+-- Keep the range rolling where pg_cron is available: every July 1st open the year after next.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule(
+      'open-schedule-year',
+      '0 3 1 7 *',
+      $cmd$SELECT t_p1843782_school_schedule_mana.create_schedule_year((EXTRACT(YEAR FROM CURRENT_DATE) + 10)::INTEGER)$cmd$
+    );
+  END IF;
+END;
+$$;